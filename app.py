@@ -9,12 +9,27 @@ Deploy: Render
 """
 
 import os
-from flask import Flask, render_template, jsonify
+import re
+import html
+import hashlib
+import multiprocessing
+import heapq
+import math
+import time
+import threading
+import json
+import unicodedata
+from collections import Counter, OrderedDict
+from flask import Flask, render_template, jsonify, request
 import sqlite3
 import datetime
 import random
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Union
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field, replace
+from itertools import islice
+from typing import Callable, Iterator, List, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
 import requests
 from apscheduler.schedulers.background import BackgroundScheduler
 
@@ -28,6 +43,44 @@ class Config:
     # Configurações do banco de dados
     DATABASE = os.path.join(os.getcwd(), "noticias.db")
     
+    # Armazenamento particionado (um arquivo SQLite por tópico)
+    SHARDED_STORAGE = os.getenv('SHARDED_STORAGE', '0') == '1'
+    SHARDS_DIR = os.getenv('SHARDS_DIR', os.path.join(os.getcwd(), "shards"))
+    MAX_WORKERS = int(os.getenv('MAX_WORKERS', 4))
+    
+    # Cota da NewsAPI (plano Developer: 100 requisições por dia)
+    QUOTA_ENABLED = os.getenv('QUOTA_ENABLED', '1') == '1'
+    NEWS_API_DAILY_LIMIT = int(os.getenv('NEWS_API_DAILY_LIMIT', 100))
+    NEWS_API_RATE_LIMITED = 'rateLimited'        # limite momentâneo
+    NEWS_API_KEY_EXHAUSTED = 'apiKeyExhausted'   # cota do dia acabou
+    
+    # Feeds personalizados
+    FEED_TOP_K = 50
+    FEED_CACHE_SIZE = int(os.getenv('FEED_CACHE_SIZE', 1000))  # perfis em memória
+    FEED_DEFAULT_TOPIC_WEIGHT = 1.0
+    
+    # Enriquecimento de texto (idioma, palavras-chave, tempo de leitura)
+    ENRICHMENT_ENABLED = os.getenv('ENRICHMENT_ENABLED', '1') == '1'
+    # Cada worker é uma cópia do app; o trabalho por ciclo leva milissegundos
+    ENRICHMENT_WORKERS = int(os.getenv('ENRICHMENT_WORKERS', 1))
+    ENRICHMENT_BATCH_SIZE = int(os.getenv('ENRICHMENT_BATCH_SIZE', 20))
+    KEYWORDS_PER_ARTICLE = 5
+    WORDS_PER_MINUTE = 200
+    CHARS_PER_WORD = 6  # média em português, contando o espaço
+    
+    # Descoberta de tendências a partir dos artigos ingeridos
+    TRENDING_ENABLED = os.getenv('TRENDING_ENABLED', '1') == '1'
+    TRENDING_CAPACITY = 200            # termos monitorados no top-k
+    TRENDING_SKETCH_WIDTH = 2048
+    TRENDING_SKETCH_DEPTH = 4
+    TRENDING_FAST_HALF_LIFE = 2 * 3600   # segundos
+    TRENDING_SLOW_HALF_LIFE = 24 * 3600  # segundos
+    TRENDING_MIN_COUNT = 5.0
+    TRENDING_MIN_GROWTH = 2.0
+    TRENDING_MIN_ZSCORE = 4.0          # desvios acima do esperado (Poisson)
+    TRENDING_MAX_QUERIES = int(os.getenv('TRENDING_MAX_QUERIES', 3))
+    TRENDING_SEEN_URLS = 5000          # artigos lembrados para não recontar
+    
     # Configurações de conteúdo
     TOPICS = [
         "Política Brasil",
@@ -78,6 +131,17 @@ class Article:
     publishedAt: str
     score: float
     last_update: Union[str, datetime.datetime]
+    language: Optional[str] = None
+    keywords: Optional[str] = None
+    reading_time: Optional[int] = None
+    content: Optional[str] = None
+
+@dataclass
+class UserProfile:
+    """Preferências de um leitor para o feed personalizado"""
+    user_id: str
+    topic_weights: Dict[str, float] = field(default_factory=dict)
+    muted_sources: List[str] = field(default_factory=list)
 
 class Database:
     """Gerenciador do banco de dados SQLite"""
@@ -87,6 +151,13 @@ class Database:
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         self.init_db()
 
+    INSERT_SQL = '''
+        INSERT INTO articles 
+        (topic, title, description, url, publishedAt, score, last_update,
+         language, keywords, reading_time, content)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
     def get_connection(self):
         return sqlite3.connect(self.db_path)
 
@@ -101,64 +172,896 @@ class Database:
                     url TEXT NOT NULL,
                     publishedAt TEXT NOT NULL,
                     score REAL NOT NULL,
-                    last_update TIMESTAMP NOT NULL
+                    last_update TIMESTAMP NOT NULL,
+                    language TEXT,
+                    keywords TEXT,
+                    reading_time INTEGER,
+                    content TEXT
                 )
             ''')
+            # Bancos criados antes do enriquecimento não têm essas colunas
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(articles)')}
+            for column, column_type in (
+                ('language', 'TEXT'),
+                ('keywords', 'TEXT'),
+                ('reading_time', 'INTEGER'),
+                ('content', 'TEXT')
+            ):
+                if column not in columns:
+                    conn.execute(
+                        f'ALTER TABLE articles ADD COLUMN {column} {column_type}'
+                    )
+
+    @staticmethod
+    def _article_params(article: Article) -> tuple:
+        last_update = (
+            article.last_update.isoformat() 
+            if isinstance(article.last_update, datetime.datetime)
+            else article.last_update
+        )
+        return (
+            article.topic,
+            article.title,
+            article.description,
+            article.url,
+            article.publishedAt,
+            article.score,
+            last_update,
+            article.language,
+            article.keywords,
+            article.reading_time,
+            article.content
+        )
+
+    @staticmethod
+    def _row_to_article(row: sqlite3.Row) -> Article:
+        row_dict = dict(row)
+        row_dict.pop('id', None)
+        
+        if isinstance(row_dict['last_update'], str):
+            try:
+                row_dict['last_update'] = datetime.datetime.fromisoformat(
+                    row_dict['last_update'].replace('Z', '+00:00')
+                )
+            except ValueError:
+                row_dict['last_update'] = datetime.datetime.now()
+        
+        return Article(id=None, **row_dict)
 
     def insert_article(self, article: Article):
+        self.insert_articles([article])
+
+    def insert_articles(self, articles: List[Article]):
         with self.get_connection() as conn:
-            last_update = (
-                article.last_update.isoformat() 
-                if isinstance(article.last_update, datetime.datetime)
-                else article.last_update
-            )
-            
-            conn.execute('''
-                INSERT INTO articles 
-                (topic, title, description, url, publishedAt, score, last_update)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                article.topic,
-                article.title,
-                article.description,
-                article.url,
-                article.publishedAt,
-                article.score,
-                last_update
-            ))
+            conn.executemany(self.INSERT_SQL, [
+                self._article_params(article) for article in articles
+            ])
 
-    def get_articles(self) -> List[Article]:
+    def replace_articles(self, topic: str, articles: List[Article]):
+        """Substitui os artigos de um tópico numa única transação"""
         with self.get_connection() as conn:
+            conn.execute('DELETE FROM articles WHERE topic = ?', (topic,))
+            conn.executemany(self.INSERT_SQL, [
+                self._article_params(article) for article in articles
+            ])
+
+    def update_enrichment(self, results: List[Dict]):
+        """Grava em lote os campos calculados pelo enriquecimento"""
+        with self.get_connection() as conn:
+            conn.executemany('''
+                UPDATE articles
+                SET title = ?, description = ?, language = ?,
+                    keywords = ?, reading_time = ?
+                WHERE topic = ? AND url = ?
+            ''', [(
+                result['title'],
+                result['description'],
+                result['language'],
+                result['keywords'],
+                result['reading_time'],
+                result['topic'],
+                result['url']
+            ) for result in results])
+
+    def iter_articles(self, topic: Optional[str] = None) -> Iterator[Article]:
+        """Percorre os artigos em ordem decrescente de score sem carregar tudo"""
+        with closing(self.get_connection()) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute('SELECT * FROM articles ORDER BY score DESC')
-            rows = cursor.fetchall()
-            articles = []
-            for row in rows:
-                row_dict = dict(row)
-                row_dict.pop('id', None)
-                
-                if isinstance(row_dict['last_update'], str):
-                    try:
-                        row_dict['last_update'] = datetime.datetime.fromisoformat(
-                            row_dict['last_update'].replace('Z', '+00:00')
-                        )
-                    except ValueError:
-                        row_dict['last_update'] = datetime.datetime.now()
-                
-                articles.append(Article(id=None, **row_dict))
-            return articles
+            if topic is None:
+                cursor = conn.execute('SELECT * FROM articles ORDER BY score DESC')
+            else:
+                cursor = conn.execute(
+                    'SELECT * FROM articles WHERE topic = ? ORDER BY score DESC',
+                    (topic,)
+                )
+            for row in cursor:
+                yield self._row_to_article(row)
+
+    def get_articles(self, topic: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[Article]:
+        return list(islice(self.iter_articles(topic), limit))
+
+    def prune_topics(self, active_topics: List[str]):
+        """Remove artigos de tópicos que deixaram de ser buscados"""
+        placeholders = ', '.join('?' for _ in active_topics)
+        with self.get_connection() as conn:
+            conn.execute(
+                f'DELETE FROM articles WHERE topic NOT IN ({placeholders})',
+                active_topics
+            )
 
     def clear_articles(self):
         with self.get_connection() as conn:
             conn.execute('DELETE FROM articles')
 
+class ShardedDatabase:
+    """Armazenamento particionado: um arquivo SQLite por tópico"""
+    
+    def __init__(self, shards_dir: str, topics: List[str]):
+        self.shards_dir = shards_dir
+        os.makedirs(self.shards_dir, exist_ok=True)
+        self.shards = {
+            topic: Database(os.path.join(self.shards_dir, self.shard_filename(topic)))
+            for topic in topics
+        }
+
+    @staticmethod
+    def shard_filename(topic: str) -> str:
+        normalized = unicodedata.normalize('NFKD', topic)
+        ascii_topic = normalized.encode('ascii', 'ignore').decode('ascii')
+        slug = re.sub(r'[^a-z0-9]+', '_', ascii_topic.lower()).strip('_')
+        # O hash do nome original evita que "Saúde" e "saude" dividam o arquivo
+        digest = hashlib.sha1(topic.encode('utf-8')).hexdigest()[:8]
+        return f"{slug or 'topico'}_{digest}.db"
+
+    def get_shard(self, topic: str) -> Database:
+        """Shard do tópico, criado sob demanda (apenas nos caminhos de escrita)"""
+        if topic not in self.shards:
+            self.shards[topic] = Database(
+                os.path.join(self.shards_dir, self.shard_filename(topic))
+            )
+        return self.shards[topic]
+
+    def insert_article(self, article: Article):
+        self.get_shard(article.topic).insert_article(article)
+
+    def insert_articles(self, articles: List[Article]):
+        by_topic: Dict[str, List[Article]] = {}
+        for article in articles:
+            by_topic.setdefault(article.topic, []).append(article)
+        for topic, topic_articles in by_topic.items():
+            self.get_shard(topic).insert_articles(topic_articles)
+
+    def replace_articles(self, topic: str, articles: List[Article]):
+        self.get_shard(topic).replace_articles(topic, articles)
+
+    def update_enrichment(self, results: List[Dict]):
+        by_topic: Dict[str, List[Dict]] = {}
+        for result in results:
+            by_topic.setdefault(result['topic'], []).append(result)
+        for topic, topic_results in by_topic.items():
+            shard = self.shards.get(topic)
+            if shard is not None:
+                shard.update_enrichment(topic_results)
+
+    def iter_articles(self, topic: Optional[str] = None) -> Iterator[Article]:
+        if topic is not None:
+            shard = self.shards.get(topic)
+            return shard.iter_articles(topic) if shard is not None else iter([])
+        # Merge k-way dos cursores de cada shard, já ordenados por score
+        return heapq.merge(
+            *(shard.iter_articles(topic) for topic, shard in list(self.shards.items())),
+            key=lambda article: article.score,
+            reverse=True
+        )
+
+    def get_articles(self, topic: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[Article]:
+        return list(islice(self.iter_articles(topic), limit))
+
+    def prune_topics(self, active_topics: List[str]):
+        for topic in list(self.shards):
+            if topic not in active_topics:
+                # O arquivo só guarda esse tópico; sem removê-lo, cada termo
+                # promovido deixaria um .db órfão após reiniciar
+                shard = self.shards.pop(topic)
+                try:
+                    os.remove(shard.db_path)
+                except FileNotFoundError:
+                    pass
+
+    def clear_articles(self):
+        for shard in self.shards.values():
+            shard.clear_articles()
+
+def create_database():
+    """Cria o backend de armazenamento conforme a configuração"""
+    if Config.SHARDED_STORAGE:
+        return ShardedDatabase(Config.SHARDS_DIR, Config.TOPICS)
+    return Database(Config.DATABASE)
+
+# Palavras funcionais usadas na detecção de idioma e nas palavras-chave
+STOPWORDS = {
+    'pt': {
+        'a', 'o', 'as', 'os', 'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'no',
+        'na', 'nos', 'nas', 'um', 'uma', 'para', 'por', 'com', 'que', 'se',
+        'não', 'ao', 'aos', 'mais', 'como', 'foi', 'são', 'pelo', 'pela',
+        'sobre', 'seu', 'sua', 'ser', 'está', 'após', 'entre', 'também', 'já'
+    },
+    'en': {
+        'the', 'of', 'and', 'to', 'in', 'is', 'for', 'on', 'with', 'that',
+        'by', 'at', 'from', 'as', 'are', 'was', 'it', 'an', 'be', 'this',
+        'has', 'have', 'after', 'over', 'new', 'its', 'will', 'not'
+    },
+    'es': {
+        'el', 'la', 'los', 'las', 'de', 'del', 'y', 'en', 'un', 'una', 'por',
+        'con', 'para', 'que', 'se', 'es', 'su', 'al', 'lo', 'como', 'más',
+        'pero', 'sus', 'fue', 'sobre', 'entre', 'tras'
+    }
+}
+ALL_STOPWORDS = set().union(*STOPWORDS.values())
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+
+def clean_text(text: Optional[str]) -> str:
+    """Remove tags HTML, decodifica entidades e normaliza espaços"""
+    if not text:
+        return ""
+    text = html.unescape(TAG_RE.sub(' ', text))
+    return ' '.join(text.split())
+
+def detect_language(words: List[str]) -> Optional[str]:
+    hits = {
+        language: sum(1 for word in words if word in stopwords)
+        for language, stopwords in STOPWORDS.items()
+    }
+    language, count = max(hits.items(), key=lambda item: item[1])
+    return language if count else None
+
+def extract_keywords(words: List[str], limit: int) -> List[str]:
+    counts = Counter(
+        word for word in words
+        if len(word) > 3 and word not in ALL_STOPWORDS
+    )
+    return [word for word, _ in counts.most_common(limit)]
+
+# A NewsAPI corta o campo content e informa o restante: "... [+2345 chars]"
+TRUNCATION_RE = re.compile(r'\s*\[\+(\d+) chars\]\s*$')
+
+def estimate_reading_time(content: Optional[str]) -> Optional[int]:
+    """Minutos de leitura do texto completo, estimados a partir do trecho"""
+    if not content:
+        return None
+    match = TRUNCATION_RE.search(content)
+    hidden_chars = int(match.group(1)) if match else 0
+    visible_words = len(WORD_RE.findall(clean_text(TRUNCATION_RE.sub('', content))))
+    words = visible_words + hidden_chars / Config.CHARS_PER_WORD
+    return max(1, round(words / Config.WORDS_PER_MINUTE))
+
+def enrich_article(data: Dict) -> Dict:
+    """Calcula os campos enriquecidos de um artigo (roda num processo filho)"""
+    title = clean_text(data.get('title'))
+    description = clean_text(data.get('description'))
+    words = WORD_RE.findall(f"{title} {description}".lower())
+    return {
+        'topic': data['topic'],
+        'url': data['url'],
+        'title': title or data.get('title') or "Sem título",
+        'description': description,
+        'language': detect_language(words),
+        'keywords': ', '.join(extract_keywords(words, Config.KEYWORDS_PER_ARTICLE)),
+        'reading_time': estimate_reading_time(data.get('content'))
+    }
+
+def enrich_batch(batch: List[Dict]) -> List[Dict]:
+    return [enrich_article(data) for data in batch]
+
+def wait_for_pool_start(barrier, timeout: float):
+    """Inicializador dos workers: segura cada um até todos existirem"""
+    barrier.wait(timeout)
+
+class EnrichmentService:
+    """Estágio de enriquecimento executado num pool de processos"""
+    
+    POOL_START_TIMEOUT = 30  # segundos
+    
+    def __init__(self, db, workers: int, batch_size: int,
+                 on_stored: Optional[Callable[[List[Dict]], None]] = None):
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        self.on_stored = on_stored
+        
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+            return
+        
+        # Todos os workers precisam nascer aqui, na thread principal, antes
+        # do agendador e das threads de atualização: fazer fork com outras
+        # threads rodando pode travar o filho. Até o Python 3.11.0 o pool cria
+        # processos sob demanda, um por submit sem worker ocioso; com todos
+        # presos na barreira nenhum fica ocioso, então cada submit abre um
+        # novo. A tarefa é do os porque este módulo ainda está sendo importado
+        context = multiprocessing.get_context('fork')
+        barrier = context.Barrier(workers + 1)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=wait_for_pool_start,
+            initargs=(barrier, self.POOL_START_TIMEOUT)
+        )
+        warmup = [self.executor.submit(os.getpid) for _ in range(workers)]
+        barrier.wait(self.POOL_START_TIMEOUT)
+        for future in warmup:
+            future.result()
+
+    def submit(self, articles: List[Article]) -> List[Future]:
+        """Enfileira os artigos em lotes; o resultado é gravado ao concluir"""
+        payload = [{
+            'topic': article.topic,
+            'title': article.title,
+            'description': article.description,
+            'content': article.content,
+            'url': article.url
+        } for article in articles]
+        
+        futures = []
+        for start in range(0, len(payload), self.batch_size):
+            future = self.executor.submit(
+                enrich_batch, payload[start:start + self.batch_size]
+            )
+            future.add_done_callback(self._store_results)
+            futures.append(future)
+        return futures
+
+    def _store_results(self, future: Future):
+        try:
+            results = future.result()
+            self.db.update_enrichment(results)
+            if self.on_stored is not None:
+                self.on_stored(results)
+        except Exception as e:
+            print(f"Erro no enriquecimento de artigos: {e}")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+class DecayClock:
+    """Decaimento exponencial "para frente": os incrementos crescem com o
+    tempo em vez de todos os contadores encolherem a cada leitura"""
+    
+    RESCALE_LIMIT = 1e100
+    
+    def __init__(self, half_life: float):
+        self.rate = math.log(2) / half_life
+        self.landmark = time.time()
+
+    def weight(self, now: float) -> float:
+        return math.exp(self.rate * (now - self.landmark))
+
+    def needs_rescale(self, now: float) -> bool:
+        return self.weight(now) > self.RESCALE_LIMIT
+
+    def window(self, elapsed: float) -> float:
+        """Peso total acumulado por um fluxo constante de 1 evento/segundo"""
+        return (1 - math.exp(-self.rate * max(elapsed, 1.0))) / self.rate
+
+class CountMinSketch:
+    """Contagem aproximada de frequências com memória fixa"""
+    
+    def __init__(self, width: int, depth: int, half_life: float):
+        self.width = width
+        self.depth = depth
+        self.table = [[0.0] * width for _ in range(depth)]
+        self.clock = DecayClock(half_life)
+
+    def _cells(self, term: str):
+        for row in range(self.depth):
+            yield row, hash((row, term)) % self.width
+
+    def add(self, term: str, now: float):
+        if self.clock.needs_rescale(now):
+            factor = self.clock.weight(now)
+            self.table = [[cell / factor for cell in row] for row in self.table]
+            self.clock.landmark = now
+        weight = self.clock.weight(now)
+        for row, col in self._cells(term):
+            self.table[row][col] += weight
+
+    def estimate(self, term: str, now: float) -> float:
+        stored = min(self.table[row][col] for row, col in self._cells(term))
+        return stored / self.clock.weight(now)
+
+class SpaceSaving:
+    """Top-k aproximado (Space-Saving) com no máximo `capacity` termos.
+
+    Cada entrada guarda [contagem, erro]: o erro é a contagem herdada do
+    termo descartado e `contagem - erro` é o mínimo garantido."""
+    
+    def __init__(self, capacity: int, half_life: float):
+        self.capacity = capacity
+        self.counts: Dict[str, List[float]] = {}
+        self.clock = DecayClock(half_life)
+
+    def add(self, term: str, now: float):
+        if self.clock.needs_rescale(now):
+            factor = self.clock.weight(now)
+            self.counts = {
+                t: [count / factor, error / factor]
+                for t, (count, error) in self.counts.items()
+            }
+            self.clock.landmark = now
+        weight = self.clock.weight(now)
+        if term in self.counts:
+            self.counts[term][0] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[term] = [weight, 0.0]
+        else:
+            # O novo termo herda a contagem do menor, que é descartado
+            victim = min(self.counts, key=lambda t: self.counts[t][0])
+            inherited = self.counts.pop(victim)[0]
+            self.counts[term] = [inherited + weight, inherited]
+
+    def top(self, now: float) -> List[tuple]:
+        """(termo, contagem garantida) em ordem decrescente"""
+        weight = self.clock.weight(now)
+        return sorted(
+            ((term, (count - error) / weight)
+             for term, (count, error) in self.counts.items()),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+class TrendTracker:
+    """Detecta termos emergentes comparando uma janela curta (top-k) com a
+    linha de base de longo prazo (Count-Min Sketch)"""
+    
+    def __init__(self, ignored_terms: List[str]):
+        self.fast = SpaceSaving(Config.TRENDING_CAPACITY, Config.TRENDING_FAST_HALF_LIFE)
+        self.slow = CountMinSketch(
+            Config.TRENDING_SKETCH_WIDTH,
+            Config.TRENDING_SKETCH_DEPTH,
+            Config.TRENDING_SLOW_HALF_LIFE
+        )
+        self.ignored = {
+            word for text in ignored_terms for word in WORD_RE.findall(text.lower())
+        }
+        # URLs já contadas, em ordem de uso, limitadas a TRENDING_SEEN_URLS
+        self.seen_urls: "OrderedDict[str, None]" = OrderedDict()
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, text: str):
+        now = time.time()
+        # Cada termo conta uma vez por texto
+        terms = {
+            word for word in WORD_RE.findall(clean_text(text).lower())
+            if len(word) > 3 and word not in ALL_STOPWORDS and word not in self.ignored
+        }
+        with self._lock:
+            for term in terms:
+                self.fast.add(term, now)
+                self.slow.add(term, now)
+
+    def _is_new(self, url: str) -> bool:
+        with self._lock:
+            if url in self.seen_urls:
+                # Artigo que segue nos resultados continua lembrado
+                self.seen_urls.move_to_end(url)
+                return False
+            self.seen_urls[url] = None
+            while len(self.seen_urls) > Config.TRENDING_SEEN_URLS:
+                self.seen_urls.popitem(last=False)
+            return True
+
+    def observe_articles(self, articles: List[Article]):
+        """Conta só artigos inéditos: a NewsAPI repete os mesmos resultados
+        a cada ciclo e isso mediria permanência, não volume de notícias"""
+        for article in articles:
+            if self._is_new(article.url):
+                self.observe(f"{article.title} {article.description or ''}")
+
+    def trending(self, limit: int) -> List[Dict]:
+        """Termos cuja taxa recente supera a taxa de longo prazo"""
+        now = time.time()
+        elapsed = now - self.started
+        fast_window = self.fast.clock.window(elapsed)
+        slow_window = self.slow.clock.window(elapsed)
+        with self._lock:
+            results = []
+            # Contagem garantida: a herdada no Space-Saving não é volume real
+            for term, fast_count in self.fast.top(now):
+                if fast_count < Config.TRENDING_MIN_COUNT:
+                    break
+                slow_count = self.slow.estimate(term, now)
+                # Normalizar pela janela observada torna as taxas comparáveis;
+                # sem histórico as duas coincidem e nada é promovido
+                growth = (fast_count / fast_window) / (slow_count / slow_window)
+                # Termos raros oscilam muito: exige que o excesso sobre o
+                # esperado pela linha de base não seja ruído de contagem
+                expected = slow_count * fast_window / slow_window
+                zscore = (fast_count - expected) / math.sqrt(expected)
+                if (growth >= Config.TRENDING_MIN_GROWTH and
+                        zscore >= Config.TRENDING_MIN_ZSCORE):
+                    results.append({
+                        'term': term,
+                        'count': round(fast_count, 2),
+                        'growth': round(growth, 2)
+                    })
+        results.sort(key=lambda item: item['growth'] * item['count'], reverse=True)
+        return results[:limit]
+
+class QuotaManager:
+    """Controle da cota da NewsAPI: token bucket persistido no SQLite,
+    contagem de chamadas por dia e por tópico"""
+    
+    def __init__(self, db_path: str, daily_limit: int):
+        self.db_path = db_path
+        self.daily_limit = daily_limit
+        # O balde se recompõe ao longo do dia na mesma taxa da cota diária
+        self.refill_rate = daily_limit / 86400.0
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.init_db()
+
+    def get_connection(self):
+        # Autocommit para controlar a transação com BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, isolation_level=None)
+
+    def init_db(self):
+        with closing(self.get_connection()) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_quota (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    exhausted_day TEXT
+                )
+            ''')
+            # Tabelas criadas antes de exhausted_day não têm a coluna
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(api_quota)')}
+            if 'exhausted_day' not in columns:
+                conn.execute('ALTER TABLE api_quota ADD COLUMN exhausted_day TEXT')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_calls (
+                    day TEXT NOT NULL,
+                    topic TEXT NOT NULL,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, topic)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS topic_fetches (
+                    topic TEXT PRIMARY KEY,
+                    last_fetch REAL NOT NULL
+                )
+            ''')
+            conn.execute(
+                'INSERT OR IGNORE INTO api_quota (id, tokens, updated_at) VALUES (1, ?, ?)',
+                (float(self.daily_limit), time.time())
+            )
+
+    @staticmethod
+    def today() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+    def _refilled_tokens(self, conn, now: float) -> float:
+        tokens, updated_at = conn.execute(
+            'SELECT tokens, updated_at FROM api_quota WHERE id = 1'
+        ).fetchone()
+        return min(
+            float(self.daily_limit),
+            tokens + (now - updated_at) * self.refill_rate
+        )
+
+    def _calls_today(self, conn) -> int:
+        row = conn.execute(
+            'SELECT COALESCE(SUM(calls), 0) FROM api_calls WHERE day = ?',
+            (self.today(),)
+        ).fetchone()
+        return row[0]
+
+    def _remaining_today(self, conn) -> int:
+        exhausted_day = conn.execute(
+            'SELECT exhausted_day FROM api_quota WHERE id = 1'
+        ).fetchone()[0]
+        if exhausted_day == self.today():
+            return 0
+        return self.daily_limit - self._calls_today(conn)
+
+    def available(self) -> int:
+        """Chamadas que ainda podem ser feitas agora"""
+        with closing(self.get_connection()) as conn:
+            tokens = self._refilled_tokens(conn, time.time())
+            remaining_today = self._remaining_today(conn)
+        return max(0, min(int(tokens), remaining_today))
+
+    def acquire(self, topic: str) -> bool:
+        """Consome um token para `topic`; False se a cota acabou"""
+        now = time.time()
+        with closing(self.get_connection()) as conn:
+            # BEGIN IMMEDIATE serializa threads e workers do gunicorn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                tokens = self._refilled_tokens(conn, now)
+                if tokens < 1 or self._remaining_today(conn) <= 0:
+                    conn.execute('ROLLBACK')
+                    return False
+                conn.execute(
+                    'UPDATE api_quota SET tokens = ?, updated_at = ? WHERE id = 1',
+                    (tokens - 1, now)
+                )
+                conn.execute('''
+                    INSERT INTO api_calls (day, topic, calls) VALUES (?, ?, 1)
+                    ON CONFLICT (day, topic) DO UPDATE SET calls = calls + 1
+                ''', (self.today(), topic))
+                conn.execute('COMMIT')
+                return True
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def exhaust(self):
+        """A API recusou por excesso de requisições: zera o balde, que volta
+        a encher na taxa normal"""
+        with closing(self.get_connection()) as conn:
+            conn.execute(
+                'UPDATE api_quota SET tokens = 0, updated_at = ? WHERE id = 1',
+                (time.time(),)
+            )
+
+    def exhaust_day(self):
+        """A API informou que a cota diária acabou: nada mais até amanhã"""
+        with closing(self.get_connection()) as conn:
+            conn.execute(
+                'UPDATE api_quota SET tokens = 0, updated_at = ?, exhausted_day = ? '
+                'WHERE id = 1',
+                (time.time(), self.today())
+            )
+
+    def mark_fetched(self, topic: str):
+        with closing(self.get_connection()) as conn:
+            conn.execute('''
+                INSERT INTO topic_fetches (topic, last_fetch) VALUES (?, ?)
+                ON CONFLICT (topic) DO UPDATE SET last_fetch = excluded.last_fetch
+            ''', (topic, time.time()))
+
+    def plan(self, topics: List[str]) -> List[str]:
+        """Com pouca cota, prioriza os tópicos há mais tempo sem atualização"""
+        budget = self.available()
+        if budget >= len(topics):
+            return list(topics)
+        
+        with closing(self.get_connection()) as conn:
+            last_fetch = dict(conn.execute('SELECT topic, last_fetch FROM topic_fetches'))
+        # Tópico nunca buscado tem o maior valor de atualização; empates
+        # mantêm a ordem original (tópicos fixos antes dos promovidos)
+        by_staleness = sorted(topics, key=lambda topic: last_fetch.get(topic, 0.0))
+        selected = set(by_staleness[:budget])
+        return [topic for topic in topics if topic in selected]
+
+    def status(self) -> Dict:
+        with closing(self.get_connection()) as conn:
+            per_topic = dict(conn.execute(
+                'SELECT topic, calls FROM api_calls WHERE day = ?', (self.today(),)
+            ))
+        return {
+            'daily_limit': self.daily_limit,
+            'calls_today': sum(per_topic.values()),
+            'available': self.available(),
+            'calls_per_topic': per_topic
+        }
+
+class ProfileStore:
+    """Persistência dos perfis de leitores no SQLite"""
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.init_db()
+
+    def get_connection(self):
+        return sqlite3.connect(self.db_path)
+
+    def init_db(self):
+        with self.get_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS user_profiles (
+                    user_id TEXT PRIMARY KEY,
+                    topic_weights TEXT NOT NULL,
+                    muted_sources TEXT NOT NULL,
+                    updated_at TIMESTAMP NOT NULL
+                )
+            ''')
+
+    def get(self, user_id: str) -> UserProfile:
+        """Perfil salvo ou, se não existir, o perfil neutro"""
+        with closing(self.get_connection()) as conn:
+            row = conn.execute(
+                'SELECT topic_weights, muted_sources FROM user_profiles WHERE user_id = ?',
+                (user_id,)
+            ).fetchone()
+        if row is None:
+            return UserProfile(user_id=user_id)
+        return UserProfile(
+            user_id=user_id,
+            topic_weights=json.loads(row[0]),
+            muted_sources=json.loads(row[1])
+        )
+
+    def save(self, profile: UserProfile):
+        with self.get_connection() as conn:
+            conn.execute('''
+                INSERT INTO user_profiles
+                (user_id, topic_weights, muted_sources, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    topic_weights = excluded.topic_weights,
+                    muted_sources = excluded.muted_sources,
+                    updated_at = excluded.updated_at
+            ''', (
+                profile.user_id,
+                json.dumps(profile.topic_weights, ensure_ascii=False),
+                json.dumps(profile.muted_sources, ensure_ascii=False),
+                datetime.datetime.now().isoformat()
+            ))
+
+def article_source(url: str) -> str:
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+class ProfileFeed:
+    """Ranking de um perfil guardado como um top-K por tópico.
+
+    O peso do tópico multiplica todos os scores dele, então dentro de um
+    tópico a ordem é a do score bruto: o feed é o merge dessas listas e a
+    chegada de artigos de um tópico só refaz a lista desse tópico."""
+    
+    def __init__(self, profile: UserProfile, k: int):
+        self.profile = profile
+        self.k = k
+        self.muted = {source.lower() for source in profile.muted_sources}
+        # Tópico -> URLs do top-K, em ordem decrescente de score
+        self.by_topic: Dict[str, List[str]] = {}
+
+    def weight(self, topic: str) -> Optional[float]:
+        weight = self.profile.topic_weights.get(topic, Config.FEED_DEFAULT_TOPIC_WEIGHT)
+        # NaN quebraria a ordenação; perfis antigos podem tê-lo salvo
+        if not math.isfinite(weight) or weight <= 0:
+            return None
+        return weight
+
+    def is_muted(self, url: str) -> bool:
+        source = article_source(url)
+        return any(source == muted or source.endswith('.' + muted) for muted in self.muted)
+
+    def set_topic(self, topic: str, articles: List[Article]):
+        """Recebe os artigos do tópico já ordenados por score"""
+        if self.weight(topic) is None:
+            self.by_topic.pop(topic, None)
+            return
+        self.by_topic[topic] = [
+            article.url for article in islice(
+                (article for article in articles if not self.is_muted(article.url)),
+                self.k
+            )
+        ]
+
+    def drop_topic(self, topic: str):
+        self.by_topic.pop(topic, None)
+
+    def _stream(self, topic: str, urls: List[str],
+                catalog: Dict[str, Dict[str, Article]]) -> Iterator[Tuple[float, Article]]:
+        weight = self.weight(topic)
+        for url in urls:
+            article = catalog[topic][url]
+            yield article.score * weight, article
+
+    def ranked(self, catalog: Dict[str, Dict[str, Article]],
+               limit: int) -> List[Tuple[float, Article]]:
+        merged = heapq.merge(
+            *(self._stream(topic, urls, catalog) for topic, urls in self.by_topic.items()),
+            key=lambda item: item[0],
+            reverse=True
+        )
+        return list(islice(merged, limit))
+
+class FeedIndex:
+    """Feeds personalizados atualizados a cada chegada de artigos, com
+    cache LRU dos perfis mais acessados"""
+    
+    def __init__(self, db, profiles: ProfileStore, k: int, cache_size: int):
+        self.profiles = profiles
+        self.k = k
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, ProfileFeed]" = OrderedDict()
+        # Catálogo atual: tópico -> {url: artigo}, em ordem decrescente de score
+        self.catalog: Dict[str, Dict[str, Article]] = {}
+        self._lock = threading.Lock()
+        
+        by_topic: Dict[str, List[Article]] = {}
+        for article in db.iter_articles():
+            by_topic.setdefault(article.topic, []).append(article)
+        for topic, articles in by_topic.items():
+            self._set_catalog(topic, articles)
+
+    def _set_catalog(self, topic: str, articles: List[Article]) -> List[Article]:
+        ordered = sorted(articles, key=lambda article: article.score, reverse=True)
+        self.catalog[topic] = {article.url: article for article in ordered}
+        return list(self.catalog[topic].values())
+
+    def _build(self, profile: UserProfile) -> ProfileFeed:
+        feed = ProfileFeed(profile, self.k)
+        for topic, articles in self.catalog.items():
+            feed.set_topic(topic, list(articles.values()))
+        return feed
+
+    def replace_topic(self, topic: str, articles: List[Article]):
+        """Refaz, em cada feed em cache, só a lista do tópico atualizado"""
+        with self._lock:
+            ordered = self._set_catalog(topic, articles)
+            for feed in self.cache.values():
+                feed.set_topic(topic, ordered)
+
+    def prune_topics(self, active_topics: List[str]):
+        with self._lock:
+            for topic in list(self.catalog):
+                if topic not in active_topics:
+                    del self.catalog[topic]
+                    for feed in self.cache.values():
+                        feed.drop_topic(topic)
+
+    def apply_enrichment(self, results: List[Dict]):
+        """Atualiza título, descrição e metadados sem mexer nos rankings"""
+        with self._lock:
+            for result in results:
+                articles = self.catalog.get(result['topic'], {})
+                article = articles.get(result['url'])
+                if article is None:
+                    continue
+                articles[result['url']] = replace(
+                    article,
+                    title=result['title'],
+                    description=result['description'],
+                    language=result['language'],
+                    keywords=result['keywords'],
+                    reading_time=result['reading_time']
+                )
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self.cache.pop(user_id, None)
+
+    def get_feed(self, user_id: str, limit: int) -> List[Tuple[float, Article]]:
+        with self._lock:
+            feed = self.cache.get(user_id)
+            if feed is not None:
+                self.cache.move_to_end(user_id)
+                return feed.ranked(self.catalog, limit)
+        
+        # Leitura do perfil fora do lock para não travar os demais
+        profile = self.profiles.get(user_id)
+        with self._lock:
+            feed = self.cache.get(user_id) or self._build(profile)
+            self.cache[user_id] = feed
+            self.cache.move_to_end(user_id)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return feed.ranked(self.catalog, limit)
+
 class NewsService:
     """Serviço para buscar notícias da NewsAPI"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, quota: Optional[QuotaManager] = None):
         self.api_key = api_key
+        self.quota = quota
 
-    def fetch_news_from_api(self, topic: str) -> List[Dict]:
+    def fetch_news_from_api(self, topic: str) -> Optional[List[Dict]]:
+        """Retorna None quando a busca falha ou é pulada por falta de cota"""
+        if self.quota is not None and not self.quota.acquire(topic):
+            print(f"Cota da API esgotada, mantendo notícias de '{topic}'")
+            return None
+        
         try:
             params = {
                 'q': topic,
@@ -173,27 +1076,64 @@ class NewsService:
                 params=params,
                 timeout=10
             )
-            response.raise_for_status()
+            if 400 <= response.status_code < 500:
+                # Erros da NewsAPI (401 apiKeyExhausted, 429 rateLimited...)
+                # trazem o código no corpo JSON
+                try:
+                    data = response.json()
+                except ValueError:
+                    response.raise_for_status()
+            else:
+                response.raise_for_status()
+                data = response.json()
             
-            data = response.json()
             if data.get("status") == "ok":
                 articles = data.get("articles", [])
                 print(f"Encontradas {len(articles)} notícias para '{topic}'")
+                if self.quota is not None:
+                    self.quota.mark_fetched(topic)
                 return articles
             else:
+                if self.quota is not None:
+                    if data.get("code") == Config.NEWS_API_KEY_EXHAUSTED:
+                        self.quota.exhaust_day()
+                    elif data.get("code") == Config.NEWS_API_RATE_LIMITED:
+                        self.quota.exhaust()
                 print(f"Erro na API: {data.get('message', 'Erro desconhecido')}")
-                return []
+                return None
                 
         except Exception as e:
             print(f"Erro ao buscar notícias para '{topic}': {e}")
-            return []
+            return None
 
 class NewsAggregator:
     """Agregador principal que coordena todos os serviços"""
     
     def __init__(self):
-        self.db = Database(Config.DATABASE)
-        self.news_service = NewsService(Config.NEWS_API_KEY)
+        self.db = create_database()
+        self.quota = (
+            QuotaManager(Config.DATABASE, Config.NEWS_API_DAILY_LIMIT)
+            if Config.QUOTA_ENABLED else None
+        )
+        self.news_service = NewsService(Config.NEWS_API_KEY, self.quota)
+        self.profiles = ProfileStore(Config.DATABASE)
+        self.feeds = FeedIndex(
+            self.db, self.profiles, Config.FEED_TOP_K, Config.FEED_CACHE_SIZE
+        )
+        self.enricher = (
+            EnrichmentService(
+                self.db,
+                Config.ENRICHMENT_WORKERS,
+                Config.ENRICHMENT_BATCH_SIZE,
+                on_stored=self.feeds.apply_enrichment
+            )
+            if Config.ENRICHMENT_ENABLED else None
+        )
+        self.trends = (
+            TrendTracker(Config.TOPICS)
+            if Config.TRENDING_ENABLED else None
+        )
+        self.trending_topics: List[str] = []
 
     def calculate_score(self, publishedAt: str) -> float:
         try:
@@ -215,29 +1155,73 @@ class NewsAggregator:
         
         return round(final_score, 2)
 
+    def update_topic(self, topic: str) -> List[Article]:
+        print(f"\nProcessando tópico: {topic}")
+        articles = self.news_service.fetch_news_from_api(topic)
+        if articles is None:
+            # Falha ou falta de cota: o que já está salvo continua valendo
+            return []
+        
+        new_articles = []
+        for art in articles:
+            current_time = datetime.datetime.now()
+            new_articles.append(Article(
+                id=None,
+                topic=topic,
+                title=art.get("title", "Sem título"),
+                description=art.get("description", ""),
+                content=art.get("content"),
+                url=art.get("url", "#"),
+                publishedAt=art.get("publishedAt", current_time.isoformat()),
+                score=self.calculate_score(art.get("publishedAt", "")),
+                last_update=current_time
+            ))
+        self.db.replace_articles(topic, new_articles)
+        self.feeds.replace_topic(topic, new_articles)
+        
+        # O enriquecimento segue em segundo plano, sem atrasar a atualização
+        if self.enricher is not None and new_articles:
+            self.enricher.submit(new_articles)
+        return new_articles
+
+    def update_topics(self, topics: List[str]) -> List[List[Article]]:
+        if self.quota is not None:
+            planned = self.quota.plan(topics)
+            skipped = [topic for topic in topics if topic not in planned]
+            if skipped:
+                print(f"\nCota baixa, adiando: {', '.join(skipped)}")
+            topics = planned
+        if Config.SHARDED_STORAGE:
+            # Cada tópico grava no seu próprio shard, então não há disputa
+            with ThreadPoolExecutor(max_workers=Config.MAX_WORKERS) as executor:
+                return list(executor.map(self.update_topic, topics))
+        return [self.update_topic(topic) for topic in topics]
+
+    def active_topics(self) -> List[str]:
+        return Config.TOPICS + self.trending_topics
+
     def update_content(self):
         print(f"\n=== Iniciando atualização: {datetime.datetime.now()} ===")
         
         try:
-            self.db.clear_articles()
+            results = self.update_topics(Config.TOPICS)
             
-            for topic in Config.TOPICS:
-                print(f"\nProcessando tópico: {topic}")
-                articles = self.news_service.fetch_news_from_api(topic)
+            if self.trends is not None:
+                # Só os tópicos fixos alimentam os contadores, evitando que
+                # um termo promovido se realimente com as próprias buscas
+                for articles in results:
+                    self.trends.observe_articles(articles)
                 
-                for art in articles:
-                    current_time = datetime.datetime.now()
-                    article = Article(
-                        id=None,
-                        topic=topic,
-                        title=art.get("title", "Sem título"),
-                        description=art.get("description", ""),
-                        url=art.get("url", "#"),
-                        publishedAt=art.get("publishedAt", current_time.isoformat()),
-                        score=self.calculate_score(art.get("publishedAt", "")),
-                        last_update=current_time
-                    )
-                    self.db.insert_article(article)
+                self.trending_topics = [
+                    item['term']
+                    for item in self.trends.trending(Config.TRENDING_MAX_QUERIES)
+                ]
+                if self.trending_topics:
+                    print(f"\nTermos em alta: {', '.join(self.trending_topics)}")
+                    self.update_topics(self.trending_topics)
+            
+            self.db.prune_topics(self.active_topics())
+            self.feeds.prune_topics(self.active_topics())
 
             print("\n=== Atualização concluída com sucesso ===")
         except Exception as e:
@@ -271,26 +1255,124 @@ def index():
             articles=articles,
             last_update=formatted_update,
             update_interval=Config.UPDATE_INTERVAL,
-            topics=Config.TOPICS,
+            topics=aggregator.active_topics(),
             topic_colors=Config.TOPIC_COLORS
         )
     except Exception as e:
         print(f"Erro na rota index: {e}")
         return "Erro ao carregar a página. Por favor, tente novamente."
 
+def article_to_dict(art: Article) -> Dict:
+    return {
+        'topic': art.topic,
+        'title': art.title,
+        'description': art.description,
+        'url': art.url,
+        'publishedAt': art.publishedAt,
+        'score': art.score,
+        'language': art.language,
+        'keywords': art.keywords.split(', ') if art.keywords else [],
+        'reading_time': art.reading_time
+    }
+
+def profile_to_dict(profile: UserProfile) -> Dict:
+    return {
+        'user_id': profile.user_id,
+        'topic_weights': profile.topic_weights,
+        'muted_sources': profile.muted_sources
+    }
+
 @app.route("/api/articles")
 def get_articles():
     """API endpoint para obter artigos em formato JSON"""
     try:
-        articles = aggregator.db.get_articles()
-        return jsonify([{
-            'topic': art.topic,
-            'title': art.title,
-            'description': art.description,
-            'url': art.url,
-            'publishedAt': art.publishedAt,
-            'score': art.score
-        } for art in articles])
+        limit = request.args.get('limit', type=int)
+        articles = aggregator.db.get_articles(
+            topic=request.args.get('topic'),
+            limit=max(0, limit) if limit is not None else None
+        )
+        return jsonify([article_to_dict(art) for art in articles])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/feed/<user_id>")
+def get_feed(user_id):
+    """API endpoint com o feed personalizado de um leitor"""
+    try:
+        limit = max(0, min(
+            request.args.get('limit', Config.FEED_TOP_K, type=int),
+            Config.FEED_TOP_K
+        ))
+        feed = aggregator.feeds.get_feed(user_id, limit)
+        return jsonify([
+            dict(article_to_dict(art), feed_score=round(score, 2))
+            for score, art in feed
+        ])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/profile/<user_id>", methods=["GET"])
+def get_profile(user_id):
+    """API endpoint para consultar as preferências de um leitor"""
+    try:
+        profile = aggregator.profiles.get(user_id)
+        return jsonify(profile_to_dict(profile))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def is_valid_weight(weight) -> bool:
+    # bool é subclasse de int e o parser JSON do Flask aceita NaN/Infinity
+    return (
+        isinstance(weight, (int, float)) and
+        not isinstance(weight, bool) and
+        math.isfinite(weight)
+    )
+
+@app.route("/api/profile/<user_id>", methods=["PUT"])
+def update_profile(user_id):
+    """API endpoint para salvar pesos de tópicos e fontes silenciadas"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'o corpo deve ser um objeto JSON'}), 400
+    topic_weights = data.get('topic_weights', {})
+    muted_sources = data.get('muted_sources', [])
+    
+    if (not isinstance(topic_weights, dict) or
+            not all(is_valid_weight(w) for w in topic_weights.values())):
+        return jsonify({'error': 'topic_weights deve mapear tópicos para números finitos'}), 400
+    if (not isinstance(muted_sources, list) or
+            not all(isinstance(s, str) for s in muted_sources)):
+        return jsonify({'error': 'muted_sources deve ser uma lista de domínios'}), 400
+    
+    try:
+        profile = UserProfile(
+            user_id=user_id,
+            topic_weights={topic: float(w) for topic, w in topic_weights.items()},
+            muted_sources=[source.lower() for source in muted_sources]
+        )
+        aggregator.profiles.save(profile)
+        aggregator.feeds.invalidate(user_id)
+        return jsonify(profile_to_dict(profile))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/trends")
+def get_trends():
+    """API endpoint com os termos em alta detectados localmente"""
+    try:
+        if aggregator.trends is None:
+            return jsonify([])
+        return jsonify(aggregator.trends.trending(Config.TRENDING_CAPACITY))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route("/api/quota")
+def get_quota():
+    """API endpoint com o consumo da cota da NewsAPI"""
+    try:
+        if aggregator.quota is None:
+            return jsonify({'enabled': False})
+        return jsonify(aggregator.quota.status())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -328,4 +1410,6 @@ if __name__ == "__main__":
         )
     except (KeyboardInterrupt, SystemExit):
         print("\n=== Encerrando aplicação ===")
-        scheduler.shutdown()
\ No newline at end of file
+        scheduler.shutdown()
+        if aggregator.enricher is not None:
+            aggregator.enricher.shutdown()
\ No newline at end of file
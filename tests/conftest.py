@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# app.py cria o banco e o pool de enriquecimento ao ser importado
+os.environ.setdefault('ENRICHMENT_ENABLED', '0')
+os.chdir(tempfile.mkdtemp())
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+import datetime
+import random
+
+import app
+
+TOPICS = [f'Tópico {i}' for i in range(11)]
+SOURCES = ['g1.globo.com', 'uol.com.br', 'folha.uol.com.br', 'estadao.com.br']
+
+
+def make_articles(rng, topic, refresh):
+    return [app.Article(
+        id=None,
+        topic=topic,
+        title=f'{topic} {refresh} {i}',
+        description='',
+        url=f'https://www.{rng.choice(SOURCES)}/{topic}/{refresh}/{i}',
+        publishedAt='2026-01-01T00:00:00Z',
+        score=rng.uniform(0, 1000),
+        last_update=datetime.datetime.now()
+    ) for i in range(5)]
+
+
+def expected_feed(feeds, profile, limit):
+    ranking = app.ProfileFeed(profile, feeds.k)
+    scored = [
+        (article.score * ranking.weight(topic), article.url)
+        for topic, articles in feeds.catalog.items()
+        if ranking.weight(topic) is not None
+        for article in articles.values()
+        if not ranking.is_muted(article.url)
+    ]
+    return sorted(scored, reverse=True)[:limit]
+
+
+def test_cached_feeds_follow_topic_refreshes(tmp_path):
+    rng = random.Random(11)
+    db = app.Database(str(tmp_path / 'noticias.db'))
+    profiles = app.ProfileStore(str(tmp_path / 'noticias.db'))
+    feeds = app.FeedIndex(db, profiles, k=10, cache_size=50)
+
+    users = []
+    for index in range(20):
+        profile = app.UserProfile(
+            user_id=f'u{index}',
+            topic_weights={topic: rng.choice([0.0, 0.5, 1.0, 3.0]) for topic in TOPICS},
+            muted_sources=rng.sample(SOURCES, rng.randint(0, 2))
+        )
+        profiles.save(profile)
+        users.append(profile)
+
+    for refresh in range(4):
+        for topic in TOPICS:
+            feeds.replace_topic(topic, make_articles(rng, topic, refresh))
+        if refresh == 2:
+            feeds.prune_topics(TOPICS[:-2])
+
+        for profile in users:
+            feed = feeds.get_feed(profile.user_id, 10)
+            assert [(round(score, 6), article.url) for score, article in feed] == [
+                (round(score, 6), url) for score, url in expected_feed(feeds, profile, 10)
+            ]
+
+
+def test_lru_cache_is_bounded(tmp_path):
+    db = app.Database(str(tmp_path / 'noticias.db'))
+    profiles = app.ProfileStore(str(tmp_path / 'noticias.db'))
+    feeds = app.FeedIndex(db, profiles, k=5, cache_size=3)
+
+    for index in range(10):
+        feeds.get_feed(f'u{index}', 5)
+
+    assert list(feeds.cache) == ['u7', 'u8', 'u9']
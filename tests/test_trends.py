@@ -0,0 +1,97 @@
+import datetime
+import random
+
+import pytest
+
+import app
+
+CYCLE = 30 * 60  # segundos entre atualizações
+ARTICLES_PER_CYCLE = 40
+WORDS_PER_ARTICLE = 8
+
+
+def make_word(index):
+    letters = ''
+    while True:
+        index, digit = divmod(index, 26)
+        letters += chr(ord('a') + digit)
+        if not index:
+            return 'pal' + letters
+
+
+VOCABULARY = [make_word(i) for i in range(2000)]
+# Distribuição de Zipf: poucos termos muito comuns, cauda longa de raros
+ZIPF_WEIGHTS = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(app.time, 'time', fake)
+    return fake
+
+
+def make_articles(rng, cycle, extra_words=(), burst=0):
+    articles = []
+    for index in range(ARTICLES_PER_CYCLE):
+        words = rng.choices(VOCABULARY, ZIPF_WEIGHTS, k=WORDS_PER_ARTICLE)
+        if index < burst:
+            words += list(extra_words)
+        articles.append(app.Article(
+            id=None,
+            topic='Economia',
+            title=' '.join(words),
+            description='',
+            url=f'https://example.com/{cycle}/{index}',
+            publishedAt='2026-01-01T00:00:00Z',
+            score=1.0,
+            last_update=datetime.datetime.now()
+        ))
+    return articles
+
+
+def test_stationary_stream_promotes_nothing(clock):
+    rng = random.Random(42)
+    tracker = app.TrendTracker(app.Config.TOPICS)
+
+    for cycle in range(5 * 48):
+        tracker.observe_articles(make_articles(rng, cycle))
+        assert tracker.trending(app.Config.TRENDING_CAPACITY) == [], cycle
+        clock.now += CYCLE
+
+
+def test_burst_term_is_promoted(clock):
+    rng = random.Random(7)
+    tracker = app.TrendTracker(app.Config.TOPICS)
+
+    for cycle in range(2 * 48):
+        tracker.observe_articles(make_articles(rng, cycle))
+        clock.now += CYCLE
+    for cycle in range(2 * 48, 2 * 48 + 2):
+        tracker.observe_articles(
+            make_articles(rng, cycle, extra_words=['apagao'], burst=15)
+        )
+        clock.now += CYCLE
+
+    terms = [item['term'] for item in tracker.trending(app.Config.TRENDING_MAX_QUERIES)]
+    assert terms == ['apagao']
+
+
+def test_refetched_articles_are_counted_once(clock):
+    rng = random.Random(3)
+    tracker = app.TrendTracker(app.Config.TOPICS)
+    articles = make_articles(rng, 0)
+
+    for _ in range(6):
+        tracker.observe_articles(articles)
+        clock.now += CYCLE
+
+    assert tracker.trending(app.Config.TRENDING_CAPACITY) == []